@@ -0,0 +1,217 @@
+"""
+Shared Google Sheets API client helpers.
+
+Loads configuration from the environment, builds the API service objects
+once per process, and wraps the Sheets read calls used by the scripts.
+"""
+
+import os
+from functools import lru_cache
+import orjson
+from dotenv import load_dotenv
+from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from googleapiclient.model import JsonModel
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Configuration
+SPREADSHEET_ID = os.getenv('SPREADSHEET_ID')
+SERVICE_ACCOUNT_FILE = os.getenv('SERVICE_ACCOUNT_FILE')
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets.readonly',
+    'https://www.googleapis.com/auth/drive.metadata.readonly'
+]
+
+# Validate required environment variables
+if not SPREADSHEET_ID:
+    raise ValueError("SPREADSHEET_ID environment variable is required. Please set it in .env file.")
+if not SERVICE_ACCOUNT_FILE:
+    raise ValueError("SERVICE_ACCOUNT_FILE environment variable is required. Please set it in .env file.")
+
+
+class OrjsonModel(JsonModel):
+    """JSON request/response model that decodes responses with orjson."""
+    
+    def deserialize(self, content):
+        # orjson parses the raw response bytes directly, without a separate decode step
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            body = content.decode('utf-8') if isinstance(content, bytes) else content
+        else:
+            if self._data_wrapper and 'data' in body:
+                body = body['data']
+        return body
+
+
+@lru_cache(maxsize=None)
+def load_credentials():
+    """Load service account credentials from JSON file."""
+    if not os.path.exists(SERVICE_ACCOUNT_FILE):
+        raise FileNotFoundError(
+            f"Service account file not found: {SERVICE_ACCOUNT_FILE}\n"
+            f"Please ensure the file exists in the current directory."
+        )
+    
+    try:
+        credentials = service_account.Credentials.from_service_account_file(
+            SERVICE_ACCOUNT_FILE,
+            scopes=SCOPES
+        )
+        return credentials
+    except Exception as e:
+        raise ValueError(
+            f"Failed to load credentials from {SERVICE_ACCOUNT_FILE}:\n{str(e)}"
+        )
+
+
+@lru_cache(maxsize=None)
+def create_authorized_http(credentials):
+    """
+    Create an authorized HTTP client shared by every API service in the process.
+    
+    httplib2 keeps connections open per host, so sharing one client lets the
+    Sheets and Drive services reuse TLS connections and the access token.
+    build_http() keeps googleapiclient's defaults (socket timeout, redirects).
+    """
+    return AuthorizedHttp(credentials, http=build_http())
+
+
+@lru_cache(maxsize=None)
+def create_sheets_service(credentials):
+    """
+    Create and return a Google Sheets API service object.
+    
+    The discovery document bundled with google-api-python-client is used, so
+    building the service makes no HTTP request.
+    """
+    try:
+        service = build(
+            'sheets', 'v4',
+            http=create_authorized_http(credentials),
+            model=OrjsonModel(),
+            static_discovery=True,
+            cache_discovery=False
+        )
+        return service
+    except Exception as e:
+        raise RuntimeError(f"Failed to create Sheets API service: {str(e)}")
+
+
+@lru_cache(maxsize=None)
+def create_drive_service(credentials):
+    """Create and return a Google Drive API service object."""
+    try:
+        service = build(
+            'drive', 'v3',
+            http=create_authorized_http(credentials),
+            model=OrjsonModel(),
+            static_discovery=True,
+            cache_discovery=False
+        )
+        return service
+    except Exception as e:
+        raise RuntimeError(f"Failed to create Drive API service: {str(e)}")
+
+
+@lru_cache(maxsize=1)
+def get_service():
+    """Return the process-wide Google Sheets API service object."""
+    return create_sheets_service(load_credentials())
+
+
+@lru_cache(maxsize=1)
+def get_drive_service():
+    """Return the process-wide Google Drive API service object."""
+    return create_drive_service(load_credentials())
+
+
+def get_modified_time(drive_service, spreadsheet_id):
+    """
+    Get the last modified time of the spreadsheet from Drive file metadata.
+    
+    Returns:
+        RFC 3339 timestamp string, or None if the metadata could not be read
+    """
+    try:
+        metadata = drive_service.files().get(
+            fileId=spreadsheet_id,
+            fields='modifiedTime'
+        ).execute()
+        return metadata.get('modifiedTime')
+    except Exception:
+        return None
+
+
+def sheet_range(sheet_name, range_name=None):
+    """Build an A1 range for a sheet, quoting the sheet name."""
+    if not range_name:
+        return sheet_name
+    quoted_name = sheet_name.replace("'", "''")
+    return f"'{quoted_name}'!{range_name}"
+
+
+def read_sheet_data(service, spreadsheet_id, sheet_name, range_name=None):
+    """Read data from a specific sheet in the spreadsheet."""
+    range_to_read = sheet_range(sheet_name, range_name)
+    
+    try:
+        result = service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=range_to_read
+        ).execute()
+        return result.get('values', [])
+    except HttpError as e:
+        if e.resp.status == 404:
+            raise ValueError(f"Sheet or range not found: {range_to_read}")
+        elif e.resp.status == 403:
+            raise PermissionError(
+                f"Permission denied when reading sheet data.\n"
+                f"Please share the spreadsheet with: hexa-service@sheets-api-473619.iam.gserviceaccount.com\n"
+                f"Error: {str(e)}"
+            )
+        else:
+            raise RuntimeError(f"Failed to read sheet data: {str(e)}")
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error reading sheet data: {str(e)}")
+
+
+def read_sheet_ranges(service, spreadsheet_id, sheet_name, range_names):
+    """
+    Read several ranges of a sheet in a single batchGet request.
+    
+    Numbers are returned unformatted so they arrive as JSON numbers rather than
+    display strings; dates are still returned as formatted strings.
+    
+    Returns:
+        List of row lists, one per requested range
+    """
+    ranges = [sheet_range(sheet_name, range_name) for range_name in range_names]
+    
+    try:
+        result = service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=ranges,
+            valueRenderOption='UNFORMATTED_VALUE',
+            dateTimeRenderOption='FORMATTED_STRING'
+        ).execute()
+    except HttpError as e:
+        if e.resp.status == 404:
+            raise ValueError(f"Sheet or range not found: {', '.join(ranges)}")
+        elif e.resp.status == 403:
+            raise PermissionError(
+                f"Permission denied when reading sheet data.\n"
+                f"Please share the spreadsheet with: hexa-service@sheets-api-473619.iam.gserviceaccount.com\n"
+                f"Error: {str(e)}"
+            )
+        else:
+            raise RuntimeError(f"Failed to read sheet data: {str(e)}")
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error reading sheet data: {str(e)}")
+    
+    return [value_range.get('values', []) for value_range in result.get('valueRanges', [])]
@@ -9,118 +9,192 @@ of items needing replenishment.
 
 import os
 import sys
+import argparse
 import csv
-import re
-from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+import gzip
+import hashlib
+import json
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import Union
+import msgspec
 from tabulate import tabulate
-
-# Load environment variables from .env file
-load_dotenv()
+from sheets_client import (
+    SPREADSHEET_ID,
+    SERVICE_ACCOUNT_FILE,
+    load_credentials,
+    get_service,
+    get_drive_service,
+    get_modified_time,
+    read_sheet_ranges
+)
 
 # Configuration
-SPREADSHEET_ID = os.getenv('SPREADSHEET_ID')
-SERVICE_ACCOUNT_FILE = os.getenv('SERVICE_ACCOUNT_FILE')
 SHEET_NAME = 'STOCK SHEET (Add New Item here)'
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
 OUTPUT_CSV = 'replenishment_items.csv'
+# Columns included in the report, as (column name, output header) pairs
+REPORT_COLUMNS = [
+    ('sno', 'Sno.'),
+    ('uid', 'UID'),
+    ('bush', 'Bush'),
+    ('group', 'Group'),
+    ('last_io_raised', 'Last I.O Raised'),
+    ('category', 'Category'),
+    ('stock_location', 'Stock Location')
+]
+REPORT_HEADERS = [header for _, header in REPORT_COLUMNS]
+# Cell types the API uses for numbers read with UNFORMATTED_VALUE (bool is excluded)
+NUMBER_TYPES = (int, float)
+DISPLAY_MAX_WIDTHS = [5, 40, 8, 8, 20, 10, 15]
+LAST_RUN_FILE = '.last_run'
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'hexa')
+# Cached ranges: one list of rows per range, cells as returned with UNFORMATTED_VALUE
+CACHE_DECODER = msgspec.json.Decoder(list[list[list[Union[str, int, float, bool]]]])
+LAST_COLUMN = 'AZ'
+HEADER_PROBE_ROWS = 15
+HEADER_PROBE_RANGE = f'A1:{LAST_COLUMN}{HEADER_PROBE_ROWS}'
+DATA_BODY_RANGE = f'A{HEADER_PROBE_ROWS + 1}:{LAST_COLUMN}'
+
+
+def column_letter(idx):
+    """Convert a zero-based column index to its A1 column letter(s)."""
+    letters = ''
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(ord('A') + rem) + letters
+    return letters
+
+
+def data_body_range(last_column_idx=None):
+    """A1 range for the data below the header probe, up to last_column_idx if given."""
+    if last_column_idx is None:
+        return DATA_BODY_RANGE
+    return f'A{HEADER_PROBE_ROWS + 1}:{column_letter(last_column_idx)}'
+
+
+def get_layout_path(spreadsheet_id, sheet_name):
+    """Build the path of the file remembering the sheet's last required column."""
+    key = json.dumps([spreadsheet_id, sheet_name])
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f"layout-{digest}.json")
+
+
+def load_last_column(layout_path):
+    """Return the last required column index seen on a previous run, if known."""
+    try:
+        with open(layout_path, 'r', encoding='utf-8') as f:
+            return int(json.load(f)['last_column'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
 
-# Validate required environment variables
-if not SPREADSHEET_ID:
-    raise ValueError("SPREADSHEET_ID environment variable is required. Please set it in .env file.")
-if not SERVICE_ACCOUNT_FILE:
-    raise ValueError("SERVICE_ACCOUNT_FILE environment variable is required. Please set it in .env file.")
 
+def save_last_column(layout_path, last_column_idx):
+    """Remember the last required column index for the next run."""
+    os.makedirs(os.path.dirname(layout_path), exist_ok=True)
+    with open(layout_path, 'w', encoding='utf-8') as f:
+        json.dump({'last_column': last_column_idx}, f)
 
-def load_credentials():
-    """Load service account credentials from JSON file."""
-    if not os.path.exists(SERVICE_ACCOUNT_FILE):
-        raise FileNotFoundError(
-            f"Service account file not found: {SERVICE_ACCOUNT_FILE}\n"
-            f"Please ensure the file exists in the current directory."
-        )
-    
+
+def read_last_run(filename):
+    """Return the spreadsheet modified time recorded by the last successful run, if any."""
     try:
-        credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE,
-            scopes=SCOPES
-        )
-        return credentials
-    except Exception as e:
-        raise ValueError(
-            f"Failed to load credentials from {SERVICE_ACCOUNT_FILE}:\n{str(e)}"
-        )
+        with open(filename, 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
 
 
-def create_sheets_service(credentials):
-    """Create and return a Google Sheets API service object."""
-    try:
-        service = build('sheets', 'v4', credentials=credentials)
-        return service
-    except Exception as e:
-        raise RuntimeError(f"Failed to create Sheets API service: {str(e)}")
+def write_last_run(filename, modified_time):
+    """Record the spreadsheet modified time the report was generated from."""
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(modified_time)
 
 
-def read_sheet_data(service, spreadsheet_id, sheet_name, range_name=None):
-    """Read data from a specific sheet in the spreadsheet."""
-    if range_name:
-        range_to_read = f"{sheet_name}!{range_name}"
-    else:
-        range_to_read = sheet_name
-    
+def get_cache_prefix(spreadsheet_id, sheet_name):
+    """Build the file name prefix shared by all cache entries for one sheet."""
+    key = json.dumps([spreadsheet_id, sheet_name])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest() + '-'
+
+
+def get_cache_path(spreadsheet_id, sheet_name, range_names, modified_time):
+    """Build the cache file path for a set of ranges at a given spreadsheet revision."""
+    key = json.dumps([list(range_names), modified_time])
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    prefix = get_cache_prefix(spreadsheet_id, sheet_name)
+    return os.path.join(CACHE_DIR, f"{prefix}{digest}.json.gz")
+
+
+def load_cached_ranges(cache_path):
+    """Load cached range values, returning None if there is no usable cache entry."""
     try:
-        result = service.spreadsheets().values().get(
-            spreadsheetId=spreadsheet_id,
-            range=range_to_read
-        ).execute()
-        return result.get('values', [])
-    except HttpError as e:
-        if e.resp.status == 404:
-            raise ValueError(f"Sheet or range not found: {range_to_read}")
-        elif e.resp.status == 403:
-            raise PermissionError(
-                f"Permission denied when reading sheet data.\n"
-                f"Please share the spreadsheet with: hexa-service@sheets-api-473619.iam.gserviceaccount.com\n"
-                f"Error: {str(e)}"
-            )
-        else:
-            raise RuntimeError(f"Failed to read sheet data: {str(e)}")
-    except Exception as e:
-        raise RuntimeError(f"Unexpected error reading sheet data: {str(e)}")
+        with open(cache_path, 'rb') as f:
+            return CACHE_DECODER.decode(gzip.decompress(f.read()))
+    except (OSError, ValueError):
+        return None
 
 
-def normalize_text(text):
-    """Normalize text for comparison (lowercase, remove extra spaces/punctuation)."""
-    if not text:
-        return ""
-    # Convert to string, lowercase, remove extra spaces
-    text = str(text).lower().strip()
-    # Remove extra spaces
-    text = re.sub(r'\s+', ' ', text)
-    return text
+def save_cached_ranges(cache_path, cache_prefix, ranges_values):
+    """
+    Write range values to the cache, replacing any existing entry atomically.
+    
+    Other entries whose file name starts with cache_prefix (older revisions or
+    other ranges of the same sheet) are deleted, so each sheet keeps one entry.
+    """
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(gzip.compress(msgspec.json.encode(ranges_values)))
+    os.replace(tmp_path, cache_path)
+    
+    cache_name = os.path.basename(cache_path)
+    for name in os.listdir(cache_dir):
+        if name.startswith(cache_prefix) and name.endswith('.json.gz') and name != cache_name:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                pass
 
 
-def find_column_index(header_row, search_terms):
+def read_sheet_ranges_cached(service, spreadsheet_id, sheet_name, range_names, modified_time):
     """
-    Find column index by searching for one of the provided terms in the header row.
+    Read several ranges of a sheet, reusing an on-disk copy while the spreadsheet
+    is unchanged.
     
-    Args:
-        header_row: List of header cell values
-        search_terms: List of possible search terms (case-insensitive)
+    The cache is keyed by the spreadsheet's Drive modifiedTime, so any edit to the
+    spreadsheet invalidates it. If modified_time is None, the ranges are always
+    fetched from the Sheets API.
     
     Returns:
-        Column index if found, None otherwise
+        Tuple of (list of row lists one per range, whether the cache was used)
     """
-    for idx, cell in enumerate(header_row):
-        normalized_cell = normalize_text(cell)
-        for term in search_terms:
-            normalized_term = normalize_text(term)
-            # Check for exact match or if term is contained in cell
-            if normalized_cell == normalized_term or normalized_term in normalized_cell:
-                return idx
-    return None
+    if not modified_time:
+        return read_sheet_ranges(service, spreadsheet_id, sheet_name, range_names), False
+    
+    cache_path = get_cache_path(spreadsheet_id, sheet_name, range_names, modified_time)
+    ranges_values = load_cached_ranges(cache_path)
+    if ranges_values is not None:
+        return ranges_values, True
+    
+    ranges_values = read_sheet_ranges(service, spreadsheet_id, sheet_name, range_names)
+    try:
+        save_cached_ranges(
+            cache_path, get_cache_prefix(spreadsheet_id, sheet_name), ranges_values
+        )
+    except OSError as e:
+        print(f"   ⚠ Could not write cache file {cache_path}: {str(e)}", file=sys.stderr)
+    return ranges_values, False
+
+
+@lru_cache(maxsize=1024)
+def normalize_text(text):
+    """Normalize text for comparison (lowercase, remove extra spaces/punctuation)."""
+    if not text:
+        return ""
+    # Convert to string, lowercase, collapse runs of whitespace
+    return ' '.join(str(text).lower().split())
 
 
 def find_header_row(data, max_rows_to_check=10):
@@ -130,15 +204,20 @@ def find_header_row(data, max_rows_to_check=10):
     Returns:
         Tuple of (header_row_index, header_row_data)
     """
-    for i in range(min(max_rows_to_check, len(data))):
-        row = data[i]
+    for i, row in enumerate(data[:max_rows_to_check]):
         if not row:
             continue
         
-        # Check if this row contains header indicators
-        row_text = ' '.join(str(cell) for cell in row).lower()
-        if 'sno' in row_text and ('uid' in row_text or 'item name' in row_text):
-            return i, row
+        # Check cell by cell for header indicators, stopping once both are seen
+        found_sno = found_uid = False
+        for cell in row:
+            cell_text = str(cell).lower()
+            if 'sno' in cell_text:
+                found_sno = True
+            if 'uid' in cell_text or 'item name' in cell_text:
+                found_uid = True
+            if found_sno and found_uid:
+                return i, row
     
     raise ValueError("Could not find header row. Expected to find 'Sno' and 'UID' columns.")
 
@@ -165,99 +244,136 @@ def find_all_columns(header_row):
         'opn_bal': [['opn. bal', 'opn bal', 'opening balance']]
     }
     
+    # Map each normalized search term to the column it identifies
+    term_to_col = {
+        normalize_text(term): col_name
+        for col_name, search_terms_list in column_definitions.items()
+        for sublist in search_terms_list
+        for term in sublist
+    }
+    
+    # Single pass over the header row, keeping the first matching cell per column
+    found = {}
+    for idx, cell in enumerate(header_row):
+        normalized_cell = normalize_text(cell)
+        for term, col_name in term_to_col.items():
+            # Check for exact match or if term is contained in cell
+            if col_name not in found and (normalized_cell == term or term in normalized_cell):
+                found[col_name] = idx
+        if len(found) == len(column_definitions):
+            break
+    
     for col_name, search_terms_list in column_definitions.items():
-        # Flatten the search terms list
-        search_terms = [term for sublist in search_terms_list for term in sublist]
-        idx = find_column_index(header_row, search_terms)
-        if idx is None:
+        if col_name not in found:
+            # Flatten the search terms list
+            search_terms = [term for sublist in search_terms_list for term in sublist]
             raise ValueError(
                 f"Required column '{col_name}' not found in header row.\n"
                 f"Searched for: {', '.join(search_terms)}\n"
                 f"Header row: {header_row}"
             )
-        columns[col_name] = idx
+        columns[col_name] = found[col_name]
     
     return columns
 
 
-def safe_float(value):
-    """Safely convert a value to float, returning None if conversion fails."""
-    if value is None or value == '':
+def to_float(value):
+    """
+    Return a cell's numeric value, or None if it is not a number.
+    
+    Sheet data is read with UNFORMATTED_VALUE, so numeric cells already arrive as
+    int/float and are returned as-is. Only numbers stored as text (e.g. '1,200')
+    still need parsing.
+    """
+    value_type = type(value)
+    if value_type in NUMBER_TYPES:
+        return value
+    if value_type is not str:
         return None
     try:
-        # Remove any commas or other formatting
-        cleaned = str(value).replace(',', '').strip()
-        return float(cleaned)
-    except (ValueError, TypeError):
+        return float(value.replace(',', ''))
+    except ValueError:
         return None
 
 
-def extract_row_data(row, columns):
-    """Extract data from a row using column indices."""
-    def get_cell(idx):
-        if idx < len(row):
-            return row[idx]
-        return ""
-    
-    return {
-        'sno': get_cell(columns['sno']),
-        'uid': get_cell(columns['uid']),
-        'bush': get_cell(columns['bush']),
-        'group': get_cell(columns['group']),
-        'last_io_raised': get_cell(columns['last_io_raised']),
-        'category': get_cell(columns['category']),
-        'stock_location': get_cell(columns['stock_location']),
-        'opn_bal': get_cell(columns['opn_bal']),
-        'min_lvl': get_cell(columns['min_lvl'])
-    }
-
-
-def filter_replenishment_items(data, header_row_idx, columns):
+def filter_replenishment_items(rows, columns):
     """
-    Filter rows where OPN. BAL < MIN LVL.
+    Filter data rows where OPN. BAL < MIN LVL.
+    
+    Rows are consumed in a single pass, so any iterable of rows can be passed.
     
     Returns:
-        List of dictionaries containing items needing replenishment
+        List of tuples (in REPORT_HEADERS order) for items needing replenishment
     """
     replenishment_items = []
     
-    for i in range(header_row_idx + 1, len(data)):
-        row = data[i]
-        
-        # Skip empty rows
-        if not row or all(not cell for cell in row):
+    # Resolve column positions once instead of per row
+    opn_bal_idx = columns['opn_bal']
+    min_lvl_idx = columns['min_lvl']
+    get_output = itemgetter(*(columns[col_name] for col_name, _ in REPORT_COLUMNS))
+    numeric_width = max(opn_bal_idx, min_lvl_idx) + 1
+    row_width = max(columns.values()) + 1
+    
+    for row in rows:
+        # Trailing empty cells are omitted by the API, so rows too short to reach
+        # both numeric columns (including empty rows) have nothing to compare
+        if len(row) < numeric_width:
             continue
         
-        # Extract row data
-        row_data = extract_row_data(row, columns)
-        
-        # Convert OPN. BAL and MIN LVL to floats
-        opn_bal = safe_float(row_data['opn_bal'])
-        min_lvl = safe_float(row_data['min_lvl'])
-        
-        # Skip if we can't parse the values
-        if opn_bal is None or min_lvl is None:
-            continue
+        # OPN. BAL and MIN LVL normally arrive as int/float already; only parse
+        # other cells (numbers stored as text, blanks)
+        opn_bal = row[opn_bal_idx]
+        if type(opn_bal) not in NUMBER_TYPES:
+            opn_bal = to_float(opn_bal)
+            if opn_bal is None:
+                continue
+        min_lvl = row[min_lvl_idx]
+        if type(min_lvl) not in NUMBER_TYPES:
+            min_lvl = to_float(min_lvl)
+            if min_lvl is None:
+                continue
         
         # Check if OPN. BAL < MIN LVL
         if opn_bal < min_lvl:
+            # Pad so every output column index is valid
+            if len(row) < row_width:
+                row = row + [''] * (row_width - len(row))
             # Add to replenishment list (exclude the numeric fields from output)
-            item = {
-                'Sno.': row_data['sno'],
-                'UID': row_data['uid'],
-                'Bush': row_data['bush'],
-                'Group': row_data['group'],
-                'Last I.O Raised': row_data['last_io_raised'],
-                'Category': row_data['category'],
-                'Stock Location': row_data['stock_location']
-            }
-            replenishment_items.append(item)
+            replenishment_items.append(get_output(row))
     
     return replenishment_items
 
 
-def display_results(items):
-    """Display results in a formatted table in the terminal."""
+def format_plain_table(rows, headers, max_widths):
+    """
+    Format rows as a plain fixed-width text table.
+    
+    Column widths are computed in one pass and capped at max_widths; longer
+    cells are truncated with an ellipsis.
+    
+    Returns:
+        List of output lines, each ending in a newline
+    """
+    str_rows = [[str(cell) for cell in row] for row in rows]
+    widths = [
+        min(max_width, max(len(header), max((len(row[i]) for row in str_rows), default=0)))
+        for i, (header, max_width) in enumerate(zip(headers, max_widths))
+    ]
+    line_format = ' | '.join(f'{{:<{width}}}' for width in widths)
+    
+    def truncate(cell, width):
+        return cell if len(cell) <= width else cell[:width - 1] + '…'
+    
+    lines = [line_format.format(*headers).rstrip() + '\n']
+    lines.append('-+-'.join('-' * width for width in widths) + '\n')
+    for row in str_rows:
+        cells = [truncate(cell, width) for cell, width in zip(row, widths)]
+        lines.append(line_format.format(*cells).rstrip() + '\n')
+    return lines
+
+
+def display_results(items, pretty=False):
+    """Display results as a table in the terminal (bordered grid if pretty is set)."""
     if not items:
         print("\n" + "=" * 80)
         print("No items found that need replenishment.")
@@ -265,94 +381,152 @@ def display_results(items):
         print("=" * 80)
         return
     
-    # Prepare data for tabulate
-    headers = ['Sno.', 'UID', 'Bush', 'Group', 'Last I.O Raised', 'Category', 'Stock Location']
-    table_data = []
-    
-    for item in items:
-        table_data.append([
-            item['Sno.'],
-            item['UID'],
-            item['Bush'],
-            item['Group'],
-            item['Last I.O Raised'],
-            item['Category'],
-            item['Stock Location']
-        ])
-    
     print("\n" + "=" * 80)
     print(f"ITEMS NEEDING REPLENISHMENT (OPN. BAL < MIN LVL)")
     print(f"Total items: {len(items)}")
     print("=" * 80)
     print()
-    print(tabulate(table_data, headers=headers, tablefmt='grid', maxcolwidths=[5, 40, 8, 8, 20, 10, 15]))
+    if pretty:
+        print(tabulate(items, headers=REPORT_HEADERS, tablefmt='grid', maxcolwidths=DISPLAY_MAX_WIDTHS))
+    else:
+        sys.stdout.writelines(format_plain_table(items, REPORT_HEADERS, DISPLAY_MAX_WIDTHS))
     print()
 
 
 def save_to_csv(items, filename):
-    """Save results to a CSV file."""
-    if not items:
-        print(f"\nNo items to save to CSV.")
-        return
-    
-    headers = ['Sno.', 'UID', 'Bush', 'Group', 'Last I.O Raised', 'Category', 'Stock Location']
+    """
+    Save results to a CSV file.
     
+    With no items, a header-only file is written so that a CSV left by an
+    earlier run is not mistaken for the current report.
+    """
     try:
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(REPORT_HEADERS)
             writer.writerows(items)
-        print(f"\n✓ Results saved to: {filename}")
+        if items:
+            print(f"\n✓ Results saved to: {filename}")
+        else:
+            print(f"\n✓ No items to save; wrote header-only CSV: {filename}")
     except Exception as e:
         raise RuntimeError(f"Failed to save CSV file: {str(e)}")
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Report stock items whose Opening Balance is below Minimum Level."
+    )
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help="display results as a bordered grid table (slower for large reports)"
+    )
+    parser.add_argument(
+        '--if-changed',
+        action='store_true',
+        help=f"skip the report if the spreadsheet has not changed since the last run "
+             f"(tracked in {LAST_RUN_FILE})"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function to generate stock replenishment report."""
+    args = parse_args(argv)
+    
     print("Stock Replenishment Report Generator")
     print("=" * 80)
     
     try:
         # Load credentials
         print(f"\n1. Loading credentials from {SERVICE_ACCOUNT_FILE}...")
-        credentials = load_credentials()
+        load_credentials()
         print("   ✓ Credentials loaded successfully")
         
         # Create Sheets service
         print("\n2. Creating Google Sheets API service...")
-        service = create_sheets_service(credentials)
+        service = get_service()
+        drive_service = get_drive_service()
         print("   ✓ Service created successfully")
         
-        # Read sheet data
-        print(f"\n3. Reading data from sheet: '{SHEET_NAME}'...")
-        data = read_sheet_data(service, SPREADSHEET_ID, SHEET_NAME)
-        print(f"   ✓ Data read successfully ({len(data)} rows)")
+        # Check when the spreadsheet was last modified
+        print("\n3. Checking spreadsheet for changes...")
+        modified_time = get_modified_time(drive_service, SPREADSHEET_ID)
+        if not modified_time:
+            print("   ⚠ Could not read the spreadsheet's modified time; change tracking disabled")
+        elif args.if_changed and read_last_run(LAST_RUN_FILE) == modified_time:
+            print(f"   ✓ Spreadsheet unchanged since last run (modified {modified_time})")
+            print("\n" + "=" * 80)
+            print(f"UNCHANGED: {OUTPUT_CSV} is already up to date.")
+            print("=" * 80)
+            return 0
+        else:
+            print(f"   ✓ Spreadsheet last modified {modified_time}")
+        
+        # Read the header area and the data below it in one request. The data is
+        # limited to the columns the report needed last time, if known.
+        print(f"\n4. Reading data from sheet: '{SHEET_NAME}'...")
+        layout_path = get_layout_path(SPREADSHEET_ID, SHEET_NAME)
+        last_column_idx = load_last_column(layout_path)
+        (header_area, body), from_cache = read_sheet_ranges_cached(
+            service, SPREADSHEET_ID, SHEET_NAME,
+            [HEADER_PROBE_RANGE, data_body_range(last_column_idx)], modified_time
+        )
+        # Trailing empty rows are omitted from the header area, so the body
+        # always starts HEADER_PROBE_ROWS rows down when it has any rows
+        row_count = HEADER_PROBE_ROWS + len(body) if body else len(header_area)
+        source = "local cache, spreadsheet unchanged" if from_cache else "Sheets API"
+        print(f"   ✓ Data read successfully ({row_count} rows, from {source})")
         
         # Find header row
-        print("\n4. Identifying header row...")
-        header_row_idx, header_row = find_header_row(data)
+        print("\n5. Identifying header row...")
+        header_row_idx, header_row = find_header_row(header_area)
         print(f"   ✓ Header row found at index {header_row_idx}")
         
         # Find all required columns
-        print("\n5. Finding required columns...")
+        print("\n6. Finding required columns...")
         columns = find_all_columns(header_row)
         print("   ✓ All required columns found:")
         for col_name, idx in columns.items():
             header_value = header_row[idx] if idx < len(header_row) else "N/A"
             print(f"      - {col_name}: column {idx} ('{header_value}')")
         
+        # If the columns have moved right since the last run, the data read above
+        # is missing some of them; read it again at full width
+        required_last_column_idx = max(columns.values())
+        if last_column_idx is not None and required_last_column_idx > last_column_idx:
+            print("   ⚠ Sheet layout changed since last run; re-reading data...")
+            (body,), _ = read_sheet_ranges_cached(
+                service, SPREADSHEET_ID, SHEET_NAME, [DATA_BODY_RANGE], modified_time
+            )
+        if required_last_column_idx != last_column_idx:
+            try:
+                save_last_column(layout_path, required_last_column_idx)
+            except OSError as e:
+                print(f"   ⚠ Could not write layout file {layout_path}: {str(e)}", file=sys.stderr)
+        
         # Filter replenishment items
-        print("\n6. Filtering items where OPN. BAL < MIN LVL...")
-        replenishment_items = filter_replenishment_items(data, header_row_idx, columns)
+        print("\n7. Filtering items where OPN. BAL < MIN LVL...")
+        # Stream the rows below the header straight from both ranges, without
+        # first joining them into one list
+        data_rows = chain(header_area[header_row_idx + 1:], body)
+        replenishment_items = filter_replenishment_items(data_rows, columns)
         print(f"   ✓ Found {len(replenishment_items)} items needing replenishment")
         
         # Display results
-        print("\n7. Displaying results...")
-        display_results(replenishment_items)
+        print("\n8. Displaying results...")
+        display_results(replenishment_items, pretty=args.pretty)
         
         # Save to CSV
-        print("\n8. Saving results to CSV...")
+        print("\n9. Saving results to CSV...")
         save_to_csv(replenishment_items, OUTPUT_CSV)
+        if modified_time:
+            try:
+                write_last_run(LAST_RUN_FILE, modified_time)
+            except OSError as e:
+                print(f"   ⚠ Could not write {LAST_RUN_FILE}: {str(e)}", file=sys.stderr)
         
         print("\n" + "=" * 80)
         print("SUCCESS: Stock replenishment report generated!")
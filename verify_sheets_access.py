@@ -6,55 +6,15 @@ This script authenticates with Google Sheets API using a service account
 and reads data from a specified spreadsheet to verify access.
 """
 
-import os
 import sys
-from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Configuration
-SPREADSHEET_ID = os.getenv('SPREADSHEET_ID')
-SERVICE_ACCOUNT_FILE = os.getenv('SERVICE_ACCOUNT_FILE')
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
-
-# Validate required environment variables
-if not SPREADSHEET_ID:
-    raise ValueError("SPREADSHEET_ID environment variable is required. Please set it in .env file.")
-if not SERVICE_ACCOUNT_FILE:
-    raise ValueError("SERVICE_ACCOUNT_FILE environment variable is required. Please set it in .env file.")
-
-
-def load_credentials():
-    """Load service account credentials from JSON file."""
-    if not os.path.exists(SERVICE_ACCOUNT_FILE):
-        raise FileNotFoundError(
-            f"Service account file not found: {SERVICE_ACCOUNT_FILE}\n"
-            f"Please ensure the file exists in the current directory."
-        )
-    
-    try:
-        credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE,
-            scopes=SCOPES
-        )
-        return credentials
-    except Exception as e:
-        raise ValueError(
-            f"Failed to load credentials from {SERVICE_ACCOUNT_FILE}:\n{str(e)}"
-        )
-
-
-def create_sheets_service(credentials):
-    """Create and return a Google Sheets API service object."""
-    try:
-        service = build('sheets', 'v4', credentials=credentials)
-        return service
-    except Exception as e:
-        raise RuntimeError(f"Failed to create Sheets API service: {str(e)}")
+from sheets_client import (
+    SPREADSHEET_ID,
+    SERVICE_ACCOUNT_FILE,
+    load_credentials,
+    get_service,
+    read_sheet_data
+)
 
 
 def get_spreadsheet_info(service, spreadsheet_id):
@@ -80,33 +40,6 @@ def get_spreadsheet_info(service, spreadsheet_id):
         raise RuntimeError(f"Unexpected error accessing spreadsheet: {str(e)}")
 
 
-def read_sheet_data(service, spreadsheet_id, sheet_name, range_name=None):
-    """Read data from a specific sheet in the spreadsheet."""
-    if range_name:
-        range_to_read = f"{sheet_name}!{range_name}"
-    else:
-        range_to_read = sheet_name
-    
-    try:
-        result = service.spreadsheets().values().get(
-            spreadsheetId=spreadsheet_id,
-            range=range_to_read
-        ).execute()
-        return result.get('values', [])
-    except HttpError as e:
-        if e.resp.status == 404:
-            raise ValueError(f"Sheet or range not found: {range_to_read}")
-        elif e.resp.status == 403:
-            raise PermissionError(
-                f"Permission denied when reading sheet data.\n"
-                f"Error: {str(e)}"
-            )
-        else:
-            raise RuntimeError(f"Failed to read sheet data: {str(e)}")
-    except Exception as e:
-        raise RuntimeError(f"Unexpected error reading sheet data: {str(e)}")
-
-
 def display_data(data, max_rows=10):
     """Display spreadsheet data in a readable format."""
     if not data:
@@ -117,8 +50,7 @@ def display_data(data, max_rows=10):
     print(f"Sheet Data (showing up to {min(len(data), max_rows)} rows):")
     print(f"{'='*60}\n")
     
-    for i, row in enumerate(data[:max_rows], 1):
-        print(f"Row {i}: {row}")
+    sys.stdout.writelines(f"Row {i}: {row}\n" for i, row in enumerate(data[:max_rows], 1))
     
     if len(data) > max_rows:
         print(f"\n... ({len(data) - max_rows} more rows not shown)")
@@ -136,12 +68,12 @@ def main():
     try:
         # Load credentials
         print(f"\n1. Loading credentials from {SERVICE_ACCOUNT_FILE}...")
-        credentials = load_credentials()
+        load_credentials()
         print("   ✓ Credentials loaded successfully")
         
         # Create Sheets service
         print("\n2. Creating Google Sheets API service...")
-        service = create_sheets_service(credentials)
+        service = get_service()
         print("   ✓ Service created successfully")
         
         # Get spreadsheet info